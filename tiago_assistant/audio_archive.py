@@ -0,0 +1,279 @@
+# tiago_assistant/audio_archive.py
+#
+# Archive audio des tours visiteurs (optionnelle), pour régler hors ligne
+# les seuils RMS, le wake word et le STT.
+#
+# - stt.py donne à l'archive les trames exactes passées à AcceptWaveform
+# - un thread d'écriture encode chaque tour en FLAC (ou Ogg Vorbis)
+# - index.jsonl (ajout seul) relie chaque segment à son texte reconnu et à
+#   sa session ; une éviction ajoute une ligne {"evicted": seq}, et l'index
+#   n'est compacté que lorsque les lignes mortes dépassent les vivantes
+# - quota disque segments + index (les plus anciens segments sont supprimés
+#   en premier) et débit d'écriture plafonné : la capture n'attend jamais le disque
+
+import atexit
+import io
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:  # dépendance optionnelle, seulement si l'archive est activée
+    sf = None
+
+
+FORMATS = {
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+}
+
+WRITE_CHUNK = 64 * 1024
+
+
+class ArchiveTurn:
+    """
+    Trames d'un tour, accumulées en mémoire côté capture (aucune E/S).
+    `finish()` envoie le tour complet au thread d'écriture.
+    """
+
+    def __init__(self, archive: "AudioArchive", session_id: str, sample_rate: int):
+        self.archive = archive
+        self.session_id = session_id
+        self.sample_rate = sample_rate
+        self.started_at = time.time()
+        self.frames: List[bytes] = []
+
+    def add(self, frame: bytes) -> None:
+        self.frames.append(frame)
+
+    def finish(self, text: str) -> None:
+        if self.frames:
+            self.archive.submit(self, text)
+
+
+class AudioArchive:
+    def __init__(
+        self,
+        root: str = "archives/audio",
+        quota_bytes: int = 500 * 1024 * 1024,
+        max_write_rate: float = 1024 * 1024,
+        fmt: str = "flac",
+        max_pending: int = 32,
+    ):
+        """
+        Archive audio en arrière-plan.
+
+        quota_bytes    : taille max segments + index.jsonl sur disque (éviction FIFO)
+        max_write_rate : débit d'écriture max en octets/s (0 = illimité)
+        max_pending    : tours en attente max ; au-delà le tour est ignoré
+        """
+        if sf is None:
+            raise RuntimeError("soundfile introuvable. Installe-le: pip install soundfile")
+        if fmt not in FORMATS:
+            raise ValueError(f"Format d'archive inconnu : '{fmt}' (flac ou ogg)")
+
+        self.root = root
+        self.segments_dir = os.path.join(root, "segments")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.quota_bytes = quota_bytes
+        self.max_write_rate = max_write_rate
+        self.fmt = fmt
+        self.dropped = 0
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+
+        self._entries: deque = deque()
+        self._used_bytes = 0
+        self._index_bytes = 0
+        self._index_dead = 0
+        self._seq = 0
+        self._session_turns: Dict[str, int] = {}
+        self._next_write = time.monotonic()
+        self._load_index()
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._writer, name="audio-archive", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # CÔTÉ CAPTURE (ne bloque jamais)
+    # ------------------------------------------------------------------
+    def start_turn(self, session_id: Optional[str] = None, sample_rate: int = 16000) -> ArchiveTurn:
+        return ArchiveTurn(self, session_id or "veille", sample_rate)
+
+    def submit(self, turn: ArchiveTurn, text: str) -> bool:
+        try:
+            self._queue.put_nowait((turn, text))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print("⚠️ Archive audio saturée, tour non archivé")
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Vide la file puis arrête le thread d'écriture."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # THREAD D'ÉCRITURE
+    # ------------------------------------------------------------------
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            turn, text = item
+            try:
+                self._write_turn(turn, text)
+            except Exception as e:
+                print("❌ Archive audio :", e)
+
+    def _write_turn(self, turn: ArchiveTurn, text: str) -> None:
+        audio = np.frombuffer(b"".join(turn.frames), dtype=np.int16)
+
+        container, subtype = FORMATS[self.fmt]
+        buf = io.BytesIO()
+        sf.write(buf, audio, turn.sample_rate, format=container, subtype=subtype)
+        data = buf.getvalue()
+
+        turn_index = self._session_turns.get(turn.session_id, 0) + 1
+        self._session_turns[turn.session_id] = turn_index
+        self._seq += 1
+
+        filename = f"{self._seq:08d}_{turn.session_id}_{turn_index:03d}.{self.fmt}"
+        path = os.path.join(self.segments_dir, filename)
+        tmp_path = path + ".part"
+        with open(tmp_path, "wb") as f:
+            self._throttled_write(f, data)
+        os.replace(tmp_path, path)
+
+        entry = {
+            "seq": self._seq,
+            "file": os.path.join("segments", filename),
+            "session": turn.session_id,
+            "turn": turn_index,
+            "text": text,
+            "time": turn.started_at,
+            "duration": round(len(audio) / turn.sample_rate, 3),
+            "sample_rate": turn.sample_rate,
+            "bytes": len(data),
+        }
+        self._entries.append(entry)
+        self._used_bytes += len(data)
+        self._append_index(entry)
+
+        self._enforce_quota()
+
+    def _throttled_write(self, f, data: bytes) -> None:
+        """Écrit par blocs en respectant max_write_rate (octets/s)."""
+        for offset in range(0, len(data), WRITE_CHUNK):
+            piece = data[offset:offset + WRITE_CHUNK]
+            f.write(piece)
+            if self.max_write_rate > 0:
+                now = time.monotonic()
+                self._next_write = max(self._next_write, now) + len(piece) / self.max_write_rate
+                delay = self._next_write - now
+                if delay > 0:
+                    time.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # INDEX / QUOTA
+    # ------------------------------------------------------------------
+    def _load_index(self) -> None:
+        """Relit index.jsonl puis nettoie les fichiers orphelins (arrêt brutal)."""
+        live: Dict[int, Dict[str, Any]] = {}
+        lines = 0
+        truncated = False
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        truncated = True  # ligne tronquée (arrêt brutal)
+                        continue
+                    if "evicted" in record:
+                        live.pop(record["evicted"], None)
+                        continue
+                    self._seq = max(self._seq, record.get("seq", 0))
+                    if os.path.exists(os.path.join(self.root, record["file"])):
+                        live[record["seq"]] = record
+            self._index_bytes = os.path.getsize(self.index_path)
+
+        for entry in live.values():
+            self._entries.append(entry)
+            self._used_bytes += entry["bytes"]
+        self._index_dead = lines - len(self._entries)
+
+        # Segments hors index (crash entre os.replace et l'ajout à l'index),
+        # fichiers .part et compaction interrompue : jamais comptés, on supprime
+        indexed = {os.path.basename(entry["file"]) for entry in self._entries}
+        for name in os.listdir(self.segments_dir):
+            if name.endswith(".part") or (name.endswith((".flac", ".ogg")) and name not in indexed):
+                os.remove(os.path.join(self.segments_dir, name))
+        if os.path.exists(self.index_path + ".tmp"):
+            os.remove(self.index_path + ".tmp")
+
+        if truncated:
+            # sinon le prochain ajout serait collé à la ligne tronquée
+            self._compact_index()
+        self._enforce_quota()
+
+    def _append_index(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.index_path, "ab") as f:
+            self._throttled_write(f, line)
+        self._index_bytes += len(line)
+
+    def _enforce_quota(self) -> None:
+        while self._entries and self._used_bytes + self._index_bytes > self.quota_bytes:
+            entry = self._entries.popleft()
+            self._used_bytes -= entry["bytes"]
+            try:
+                os.remove(os.path.join(self.root, entry["file"]))
+            except FileNotFoundError:
+                pass
+            self._append_index({"evicted": entry["seq"]})
+            self._index_dead += 2  # l'entrée évincée + sa ligne d'éviction
+
+        if self._index_dead > len(self._entries):
+            self._compact_index()
+
+    def _compact_index(self) -> None:
+        """Réécrit l'index avec les seules entrées vivantes (débit plafonné)."""
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self._entries)
+        data = data.encode("utf-8")
+
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            self._throttled_write(f, data)
+        os.replace(tmp_path, self.index_path)
+
+        self._index_bytes = len(data)
+        self._index_dead = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segments": len(self._entries),
+            "bytes": self._used_bytes,
+            "index_bytes": self._index_bytes,
+            "quota_bytes": self.quota_bytes,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,203 @@
+# tiago_assistant/dialog.py
+#
+# Logique de décision de la conversation (sans micro, sans TTS).
+# Utilisée par main.py (robot) et par simulator.py (tests de débit).
+
+from typing import List, Dict, Optional
+
+
+# Mapping des formations
+FORMATIONS = {
+    1: {"label": "Programme Grande Ecole", "couleur": "jaune"},
+    2: {"label": "Bachelor De Specialite", "couleur": "bleu"},
+    3: {"label": "Programme Executive", "couleur": "vert"},
+    4: {"label": "Master Professionnel", "couleur": "rouge"}
+}
+
+GREETING = "Bonjour ! Je suis Tiago. Quel est votre projet de formation aujourd'hui ?"
+DONE_MSG = "Génial ! Je vous accompagne. Bonne visite !"
+HANDOFF_MSG = "L'équipe sur place pourra vous en dire plus sur ce point !"
+ERROR_MSG = "Désolé, pouvez-vous reformuler ?"
+
+
+def is_wake(text: str) -> bool:
+    """Wake word permissif : 'tiago' suffit"""
+    t = (text or "").lower().strip()
+    return "tiago" in t if t else False
+
+
+def build_json(say: str, done: bool = False, ask_confirmation: bool = False,
+               formation_id: Optional[int] = None, handoff: bool = False) -> Dict:
+    """Construit le JSON de sortie."""
+    proposed = None
+    if formation_id and formation_id in FORMATIONS:
+        proposed = FORMATIONS[formation_id].copy()
+
+    response = {
+        "say": say,
+        "done": done,
+        "ask_confirmation": ask_confirmation,
+        "proposed": proposed,
+        "int": formation_id if done else None ,
+        "handoff": handoff
+    }
+
+    return response
+
+
+def detect_formation_from_history(history: List[Dict]) -> Optional[int]:
+    """
+    Analyse l'historique pour détecter quelle formation proposer.
+    Retourne l'ID de la formation (1-4) ou None.
+    """
+    # Concaténer toute la conversation
+    text = " ".join([msg["content"].lower() for msg in history])
+
+    niveau = None
+    objectif = None
+
+    # Détecter le niveau
+    if any(w in text for w in ["terminale", "lycée", "lycéen", "bac général", "sti2d"]):
+        niveau = "lycee"
+    elif any(w in text for w in ["bac+2", "bac+3", "prépa", "but", "bts", "licence", "bac 2", "bac 3"]):
+        niveau = "bac23"
+    elif any(w in text for w in ["bac+4", "master 1", "bac 4"]):
+        niveau = "bac34"
+    elif any(w in text for w in ["professionnel", "pro en poste", "salarié", "travaille", "emploi"]):
+        niveau = "pro"
+
+    # Détecter l'objectif
+    if any(w in text for w in ["ingénieur", "ingénierie", "grande école", "grandes écoles"]):
+        objectif = "ingenieur"
+    elif any(w in text for w in ["bac+3", "bachelor", "bac 3"]):
+        objectif = "bac3"
+    elif any(w in text for w in ["master", "spécialisation", "bac+5", "bac+6", "bac 5", "bac 6"]):
+        objectif = "master"
+    elif any(w in text for w in ["formation continue", "executive"]):
+        objectif = "executive"
+
+    # Logique de matching
+    if niveau == "lycee" and objectif == "ingenieur":
+        return 1  # Programme Grande Ecole
+    elif niveau == "lycee" and objectif == "bac3":
+        return 2  # Bachelor De Specialite
+    elif niveau in ["bac23", "bac34"] and objectif == "ingenieur":
+        return 1  # Programme Grande Ecole
+    elif niveau in ["bac23", "bac34"] and objectif == "master":
+        return 4  # Master Professionnel
+    elif niveau == "pro" or objectif == "executive":
+        return 3  # Programme Executive
+
+    return None
+
+
+def is_confirmation(text: str) -> bool:
+    """Détecte si l'utilisateur confirme."""
+    text_lower = text.lower().strip()
+    return any(w in text_lower for w in ["oui", "ok", "d'accord", "parfait", "allons", "vas-y", "go", "pourra"])
+
+
+def needs_handoff(text: str) -> bool:
+    """Détecte si la question nécessite un handoff à l'équipe."""
+    text_lower = text.lower()
+    keywords = ["tarif", "prix", "coût", "coute", "combien", "date", "rentrée", "inscription", "admission", "sélection"]
+    return any(kw in text_lower for kw in keywords)
+
+
+class DialogSession:
+    """
+    État d'une conversation après le wake word.
+
+    Aucune entrée/sortie ici : `step()` reçoit le texte reconnu et retourne
+    le JSON à prononcer. L'appelant gère le micro, le TTS et l'affichage.
+    Le `llm` doit seulement exposer `chat_text(history, temperature)`.
+    """
+
+    def __init__(self, llm, max_turns: int = 10, temperature: float = 0.35):
+        self.llm = llm
+        self.max_turns = max_turns
+        self.temperature = temperature
+
+        self.history: List[Dict[str, str]] = []
+        self.formation_proposed: Optional[int] = None
+        self.waiting_confirmation = False
+        self.turn_count = 0
+        self.final_formation_id: Optional[int] = None
+        self.finished = False
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def active(self) -> bool:
+        """Vrai tant que la conversation doit continuer."""
+        return not self.finished and self.turn_count < self.max_turns
+
+    def greet(self) -> Dict:
+        """Message d'accueil (ajouté à l'historique)."""
+        self.history.append({"role": "assistant", "content": GREETING})
+        return build_json(GREETING)
+
+    def step(self, user: Optional[str]) -> Optional[Dict]:
+        """
+        Traite un tour utilisateur.
+        Retourne le JSON de réponse, ou None si l'entrée est ignorée
+        (rien de clair détecté : le tour n'est pas compté).
+        """
+        self.last_error = None
+
+        if not user or len(user.strip()) < 3:
+            return None
+
+        # Si on attend une confirmation
+        if self.waiting_confirmation and is_confirmation(user):
+            self.final_formation_id = self.formation_proposed
+            self.finished = True
+            return build_json(
+                say=DONE_MSG,
+                done=True,
+                formation_id=self.formation_proposed
+            )
+
+        self.history.append({"role": "user", "content": user})
+
+        # Limiter l'historique
+        if len(self.history) > 8:
+            self.history = [self.history[0]] + self.history[-7:]
+
+        # Vérifier si handoff nécessaire
+        if needs_handoff(user):
+            self.history.append({"role": "assistant", "content": HANDOFF_MSG})
+            self.turn_count += 1
+            return build_json(HANDOFF_MSG, handoff=True)
+
+        try:
+            response = self.llm.chat_text(
+                history=self.history,
+                temperature=self.temperature
+            )
+        except Exception as e:
+            self.last_error = e
+            self.turn_count += 1
+            return build_json(ERROR_MSG)
+
+        # Détecter si on peut proposer une formation
+        formation_id = detect_formation_from_history(self.history + [{"role": "assistant", "content": response}])
+
+        if formation_id and not self.waiting_confirmation:
+            # On a détecté une formation, on propose
+            formation = FORMATIONS[formation_id]
+            propose_msg = f"Le {formation['label']} est parfait pour vous. Je vous y accompagne ?"
+            self.history.append({"role": "assistant", "content": propose_msg})
+
+            self.formation_proposed = formation_id
+            self.waiting_confirmation = True
+            self.turn_count += 1
+            return build_json(
+                say=propose_msg,
+                ask_confirmation=True,
+                formation_id=formation_id
+            )
+
+        # Réponse normale
+        self.history.append({"role": "assistant", "content": response})
+        self.turn_count += 1
+        return build_json(say=response)
@@ -0,0 +1,345 @@
+# tiago_assistant/simulator.py
+#
+# Simulateur de dialogues texte (sans micro, sans TTS, sans robot).
+# Rejoue des visiteurs scriptés ou aléatoires à travers DialogSession,
+# la même logique de tour que main.py, avec un LLM interchangeable.
+#
+# Exemples :
+#   python -m tiago_assistant.simulator --dialogs 10000 --workers 4
+#   python -m tiago_assistant.simulator --script dialogues.json
+#   python -m tiago_assistant.simulator --llm tiago_assistant.ollama_client:OllamaClient \
+#       --llm-options '{"model": "tiago-final"}'
+
+import argparse
+import importlib
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from tiago_assistant.dialog import FORMATIONS, DialogSession, is_wake
+
+
+# ----------------------------------------------------------------------
+# LLM
+# ----------------------------------------------------------------------
+class StubLLM:
+    """
+    Faux LLM : réponses neutres (aucun mot-clé de formation),
+    latence et taux d'erreur optionnels pour simuler Ollama.
+    """
+
+    REPLIES = [
+        "Très bien ! Quel est votre niveau d'études actuel ?",
+        "D'accord. Quel domaine vous intéresse le plus ?",
+        "Pouvez-vous m'en dire plus sur votre parcours ?",
+        "Super ! Quel diplôme visez-vous ?",
+    ]
+
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self._rng = random.Random(seed)
+
+    def chat_text(self, history: List[Dict[str, str]], temperature: float = 0.35) -> str:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if self.fail_rate > 0 and self._rng.random() < self.fail_rate:
+            raise RuntimeError("erreur LLM simulée")
+        return self._rng.choice(self.REPLIES)
+
+
+class CountingLLM:
+    """Enveloppe un LLM quelconque et compte les appels à chat_text()."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = 0
+
+    def chat_text(self, history: List[Dict[str, str]], temperature: float = 0.35) -> str:
+        self.calls += 1
+        return self.llm.chat_text(history=history, temperature=temperature)
+
+
+def make_llm(spec: str = "stub", options: Optional[Dict[str, Any]] = None):
+    """
+    Construit le LLM à partir d'une spec sérialisable (pour le pool de processus) :
+    - "stub" : StubLLM(**options)
+    - "module:Classe" : n'importe quelle classe exposant chat_text(history, temperature)
+    """
+    options = options or {}
+    if spec == "stub":
+        return StubLLM(**options)
+
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Spec LLM invalide : '{spec}' (attendu 'module:Classe')")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(**options)
+
+
+# ----------------------------------------------------------------------
+# VISITEURS ALÉATOIRES
+# ----------------------------------------------------------------------
+WAKE_PHRASES = ["bonjour tiago", "salut tiago", "tiago", "hé tiago tu m'entends"]
+NOT_WAKE_PHRASES = ["bonjour", "c'est où la cafétéria", "euh"]
+
+INTROS = ["je cherche une formation", "je viens me renseigner", "bonjour je voudrais des infos"]
+
+NIVEAUX = [
+    "je suis en terminale",
+    "je suis lycéen en sti2d",
+    "j'ai un bts",
+    "je suis en licence",
+    "je suis en bac+4",
+    "je suis salarié dans l'industrie",
+    "je travaille depuis cinq ans",
+]
+
+OBJECTIFS = [
+    "je veux devenir ingénieur",
+    "je vise une grande école",
+    "je voudrais un bachelor",
+    "j'aimerais faire un master",
+    "je cherche une spécialisation",
+    "plutôt de la formation continue",
+]
+
+VAGUES = ["je ne sais pas trop", "l'informatique peut-être", "j'hésite encore", "la robotique m'intéresse"]
+HANDOFFS = ["combien ça coûte", "c'est quand la rentrée", "comment se passe l'admission"]
+MUMBLES = ["", "euh", "hm"]
+CONFIRMATIONS = ["oui", "d'accord", "ok super", "oui allons-y"]
+REFUSALS = ["non merci", "je vais réfléchir"]
+
+
+def random_dialog(rng: random.Random) -> List[str]:
+    """Génère un visiteur : wake word puis suite de phrases."""
+    wake = rng.choice(NOT_WAKE_PHRASES) if rng.random() < 0.1 else rng.choice(WAKE_PHRASES)
+    turns: List[str] = []
+
+    if rng.random() < 0.5:
+        turns.append(rng.choice(INTROS))
+
+    # ~15 % de visiteurs qui ne donnent jamais leur profil
+    if rng.random() < 0.15:
+        turns += [rng.choice(VAGUES) for _ in range(rng.randint(3, 12))]
+    else:
+        parts = [rng.choice(NIVEAUX), rng.choice(OBJECTIFS)]
+        rng.shuffle(parts)
+        turns += parts
+
+    if rng.random() < 0.2:
+        turns.insert(rng.randint(0, len(turns)), rng.choice(HANDOFFS))
+    if rng.random() < 0.1:
+        turns.insert(rng.randint(0, len(turns)), rng.choice(MUMBLES))
+
+    if rng.random() < 0.2:
+        turns.append(rng.choice(REFUSALS))
+    turns.append(rng.choice(CONFIRMATIONS))
+
+    return [wake] + turns
+
+
+# ----------------------------------------------------------------------
+# SIMULATION
+# ----------------------------------------------------------------------
+def simulate_dialog(utterances: List[str], llm, max_turns: int = 10) -> Dict[str, Any]:
+    """
+    Rejoue un dialogue : utterances[0] est la phrase de veille,
+    la suite est donnée tour par tour à DialogSession.
+    """
+    counter = CountingLLM(llm)
+    result = {"outcome": "veille", "turns": 0, "llm_calls": 0, "formation_id": None}
+
+    if not utterances or not is_wake(utterances[0]):
+        return result
+
+    session = DialogSession(counter, max_turns=max_turns)
+    session.greet()
+
+    for user in utterances[1:]:
+        if not session.active:
+            break
+        if session.step(user) is not None:
+            result["turns"] += 1
+
+    if session.finished:
+        result["outcome"] = "recommandation"
+    elif not session.active:
+        result["outcome"] = "max_turns"
+    else:
+        result["outcome"] = "abandon"
+
+    result["llm_calls"] = counter.calls
+    result["formation_id"] = session.final_formation_id
+    return result
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "dialogs": 0,
+        "turns": 0,
+        "llm_calls": 0,
+        "llm_calls_recommended": 0,
+        "outcomes": Counter(),
+        "formations": Counter(),
+    }
+
+
+def _merge_stats(total: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for key in ("dialogs", "turns", "llm_calls", "llm_calls_recommended"):
+        total[key] += part[key]
+    total["outcomes"].update(part["outcomes"])
+    total["formations"].update(part["formations"])
+
+
+def _run_chunk(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Exécute un lot de dialogues (dans le processus courant ou un worker)."""
+    options = dict(job["llm_options"] or {})
+    if job["llm_spec"] == "stub":
+        # Graine propre au lot : erreurs et réponses non corrélées entre lots
+        options["seed"] = f"llm-{job['seed']}"
+    llm = make_llm(job["llm_spec"], options)
+    dialogs = job["dialogs"]
+    if dialogs is None:
+        rng = random.Random(job["seed"])
+        dialogs = (random_dialog(rng) for _ in range(job["count"]))
+
+    stats = _empty_stats()
+    for utterances in dialogs:
+        result = simulate_dialog(utterances, llm, max_turns=job["max_turns"])
+        stats["dialogs"] += 1
+        stats["turns"] += result["turns"]
+        stats["llm_calls"] += result["llm_calls"]
+        stats["outcomes"][result["outcome"]] += 1
+        if result["outcome"] == "recommandation":
+            stats["llm_calls_recommended"] += result["llm_calls"]
+            stats["formations"][result["formation_id"]] += 1
+    return stats
+
+
+def simulate(
+    dialogs: Optional[List[List[str]]] = None,
+    count: int = 1000,
+    seed: int = 0,
+    llm_spec: str = "stub",
+    llm_options: Optional[Dict[str, Any]] = None,
+    max_turns: int = 10,
+    workers: int = 1,
+    chunk_size: int = 500,
+) -> Dict[str, Any]:
+    """
+    Lance la simulation et retourne les statistiques agrégées.
+    Sans `dialogs`, génère `count` visiteurs aléatoires (reproductibles via `seed`).
+    Avec workers > 1, les lots sont répartis sur un ProcessPoolExecutor.
+    """
+    jobs = []
+    base = {"llm_spec": llm_spec, "llm_options": llm_options, "max_turns": max_turns}
+    if dialogs is not None:
+        for i, start in enumerate(range(0, len(dialogs), chunk_size)):
+            jobs.append(dict(base, dialogs=dialogs[start:start + chunk_size],
+                             seed=seed * 1_000_003 + i))
+    else:
+        for i, start in enumerate(range(0, count, chunk_size)):
+            jobs.append(dict(base, dialogs=None, seed=seed * 1_000_003 + i,
+                             count=min(chunk_size, count - start)))
+
+    stats = _empty_stats()
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_run_chunk, jobs):
+                _merge_stats(stats, part)
+    else:
+        for job in jobs:
+            _merge_stats(stats, _run_chunk(job))
+    stats["elapsed"] = time.perf_counter() - start
+
+    recommended = stats["outcomes"]["recommandation"]
+    stats["turns_per_second"] = stats["turns"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+    stats["llm_calls_per_recommendation"] = stats["llm_calls"] / recommended if recommended else None
+    stats["llm_calls_per_recommended_dialog"] = (
+        stats["llm_calls_recommended"] / recommended if recommended else None
+    )
+    return stats
+
+
+def format_report(stats: Dict[str, Any]) -> str:
+    """Rapport texte lisible."""
+    def ratio(value: Optional[float]) -> str:
+        return f"{value:.2f}" if value is not None else "n/a"
+
+    lines = [
+        "=" * 60,
+        "📊 SIMULATION TIAGO",
+        "=" * 60,
+        f"Dialogues        : {stats['dialogs']}",
+        f"Tours            : {stats['turns']} en {stats['elapsed']:.2f}s "
+        f"({stats['turns_per_second']:.0f} tours/s)",
+        f"Appels LLM       : {stats['llm_calls']}",
+        f"LLM / recommandation (tous dialogues)   : {ratio(stats['llm_calls_per_recommendation'])}",
+        f"LLM / recommandation (dialogues aboutis) : {ratio(stats['llm_calls_per_recommended_dialog'])}",
+        "",
+        "Issues :",
+    ]
+    for outcome, n in stats["outcomes"].most_common():
+        lines.append(f"  {outcome:<16} {n:>8}  ({100 * n / stats['dialogs']:.1f} %)")
+
+    lines.append("")
+    lines.append("Formations recommandées :")
+    recommended = sum(stats["formations"].values())
+    for formation_id in sorted(FORMATIONS):
+        n = stats["formations"][formation_id]
+        share = 100 * n / recommended if recommended else 0.0
+        label = FORMATIONS[formation_id]["label"]
+        lines.append(f"  {formation_id} - {label:<24} {n:>8}  ({share:.1f} %)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Simulateur de dialogues TIAGO (texte, sans robot)")
+    parser.add_argument("--dialogs", type=int, default=1000, help="nombre de visiteurs aléatoires")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", help="fichier JSON : liste de dialogues (listes de phrases, wake word en premier)")
+    parser.add_argument("--llm", default="stub", help="'stub' ou 'module:Classe' exposant chat_text()")
+    parser.add_argument("--llm-options", default="{}",
+                        help="arguments JSON du LLM, ex: '{\"model\": \"tiago-final\"}'")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="latence du stub (secondes)")
+    parser.add_argument("--llm-fail-rate", type=float, default=0.0, help="taux d'erreur du stub (0-1)")
+    parser.add_argument("--max-turns", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="processus en parallèle")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="sortie JSON au lieu du rapport texte")
+    args = parser.parse_args(argv)
+
+    dialogs = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            dialogs = json.load(f)
+
+    llm_options = json.loads(args.llm_options)
+    if args.llm == "stub":
+        llm_options = dict({"latency": args.llm_latency, "fail_rate": args.llm_fail_rate}, **llm_options)
+
+    stats = simulate(
+        dialogs=dialogs,
+        count=args.dialogs,
+        seed=args.seed,
+        llm_spec=args.llm,
+        llm_options=llm_options,
+        max_turns=args.max_turns,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(stats))
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -30,10 +30,15 @@ def listen_from_micro(
     timeout_seconds: float = 20.0,
     silence_seconds: float = 2.0,
     device_alsa: str = "hw:2,0",   # ✅ ton device Linux
+    archive=None,
+    session_id: Optional[str] = None,
 ) -> str:
     """
     Capture micro via arecord (ALSA), pas de PyAudio.
     Retourne le texte reconnu.
+
+    Si `archive` (AudioArchive) est fourni, les trames envoyées à Vosk
+    sont archivées en arrière-plan avec le texte reconnu.
     """
     recognizer = _get_recognizer()
 
@@ -64,6 +69,9 @@ def listen_from_micro(
     target_rms = 0.05
     max_gain = 2.5
 
+    turn = archive.start_turn(session_id, sample_rate) if archive is not None else None
+    text = ""
+
     print("Parlez maintenant...")
 
     try:
@@ -97,6 +105,9 @@ def listen_from_micro(
             audio_np = np.clip(audio_np, -32768, 32767)
             norm_data = audio_np.astype(np.int16).tobytes()
 
+            if turn is not None:
+                turn.add(norm_data)
+
             if recognizer.AcceptWaveform(norm_data):
                 result = json.loads(recognizer.Result())
                 text = (result.get("text") or "").strip()
@@ -115,6 +126,8 @@ def listen_from_micro(
         return text
 
     finally:
+        if turn is not None:
+            turn.finish(text)
         try:
             proc.terminate()
         except Exception:
@@ -4,6 +4,7 @@ import queue
 import sys
 import time
 import math
+from typing import Optional
 
 import pyaudio
 import numpy as np
@@ -21,10 +22,14 @@ def listen_from_micro(
     chunk_size: int = 4000,
     timeout_seconds: float = 20.0,
     silence_seconds: float = 2.0,
+    archive=None,
+    session_id: Optional[str] = None,
 ) -> str:
     """
     Écoute le micro (réutilise le modèle déjà chargé).
+    Même archive optionnelle que stt.listen_from_micro.
     """
+    turn = archive.start_turn(session_id, sample_rate) if archive is not None else None
 
     audio_interface = pyaudio.PyAudio()
     audio_queue = queue.Queue()
@@ -89,6 +94,9 @@ def listen_from_micro(
         else:
             norm_data = data
 
+        if turn is not None:
+            turn.add(norm_data)
+
         if recognizer.AcceptWaveform(norm_data):
             result = json.loads(recognizer.Result())
             text = result.get("text", "")
@@ -97,6 +105,8 @@ def listen_from_micro(
                 stream.stop_stream()
                 stream.close()
                 audio_interface.terminate()
+                if turn is not None:
+                    turn.finish(text.strip())
                 return text.strip()
 
     final = json.loads(recognizer.FinalResult())
@@ -111,6 +121,8 @@ def listen_from_micro(
     stream.stop_stream()
     stream.close()
     audio_interface.terminate()
+    if turn is not None:
+        turn.finish(text)
     return text
 
 